@@ -1,14 +1,21 @@
 from collections import UserList
+from typing import Iterable, Optional
 
 
 class CaseInsensitiveList(UserList):
     """
     Simple list type for storing and comparing strings case-insensitively
     """
+    def __init__(self, initlist: Optional[Iterable] = None) -> None:
+        super(CaseInsensitiveList, self).__init__(initlist)
+        self.data = [item.casefold() if isinstance(item, str) else item for item in self.data]
+        self._item_set: set = set(self.data)
+
     def __contains__(self, item: object) -> bool:
-        if isinstance(item, str):
-            return any(item.casefold() == x.casefold() for x in self.data)
-        return item in self.data
+        return (item.casefold() if isinstance(item, str) else item) in self._item_set
 
     def append(self, item: object) -> None:
-        self.data.append(item.casefold() if isinstance(item, str) else item)
+        if isinstance(item, str):
+            item = item.casefold()
+        self.data.append(item)
+        self._item_set.add(item)
@@ -3,6 +3,8 @@ from typing import Optional, Union
 
 from lxml import etree
 
+from pyro.Constants import XmlTagName
+
 
 def startswith(a_source: str, a_prefix: Union[str, tuple],
                a_start: Optional[int] = None, a_end: Optional[int] = None, /, ignorecase: bool = False) -> bool:
@@ -45,39 +47,39 @@ def endswith(a_source: str, a_suffix: Union[str, tuple],
 
 
 def is_command_node(node: etree.ElementBase) -> bool:
-    return node is not None and endswith(node.tag, 'Command') and node.text is not None
+    return node is not None and etree.QName(node).localname == XmlTagName.COMMAND and node.text is not None
 
 
 def is_folder_node(node: etree.ElementBase) -> bool:
-    return node is not None and endswith(node.tag, 'Folder') and node.text is not None
+    return node is not None and etree.QName(node).localname == XmlTagName.FOLDER and node.text is not None
 
 
 def is_import_node(node: etree.ElementBase) -> bool:
-    return node is not None and endswith(node.tag, 'Import') and node.text is not None
+    return node is not None and etree.QName(node).localname == XmlTagName.IMPORT and node.text is not None
 
 
 def is_include_node(node: etree.ElementBase) -> bool:
-    return node is not None and endswith(node.tag, 'Include') and node.text is not None
+    return node is not None and etree.QName(node).localname == XmlTagName.INCLUDE and node.text is not None
 
 
 def is_match_node(node: etree.ElementBase) -> bool:
-    return node is not None and endswith(node.tag, 'Match') and node.text is not None
+    return node is not None and etree.QName(node).localname == XmlTagName.MATCH and node.text is not None
 
 
 def is_package_node(node: etree.ElementBase) -> bool:
-    return node is not None and endswith(node.tag, 'Package')
+    return node is not None and etree.QName(node).localname == XmlTagName.PACKAGE
 
 
 def is_script_node(node: etree.ElementBase) -> bool:
-    return node is not None and endswith(node.tag, 'Script') and node.text is not None
+    return node is not None and etree.QName(node).localname == XmlTagName.SCRIPT and node.text is not None
 
 
 def is_variable_node(node: etree.ElementBase) -> bool:
-    return node is not None and endswith(node.tag, 'Variable')
+    return node is not None and etree.QName(node).localname == XmlTagName.VARIABLE
 
 
 def is_zipfile_node(node: etree.ElementBase) -> bool:
-    return node is not None and endswith(node.tag, 'ZipFile')
+    return node is not None and etree.QName(node).localname == XmlTagName.ZIP_FILE
 
 
 def is_namespace_path(node: etree.ElementBase) -> bool:
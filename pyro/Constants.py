@@ -25,6 +25,7 @@ class GameType(Constant):
 class XmlAttributeName(Constant):
     ANONYMIZE: str = 'Anonymize'
     COMPRESSION: str = 'Compression'
+    COMPRESSION_LEVEL: str = 'CompressionLevel'
     DESCRIPTION: str = 'Description'
     EXCLUDE: str = 'Exclude'
     FINAL: str = 'Final'
@@ -45,6 +46,7 @@ class XmlAttributeName(Constant):
 
 
 class XmlTagName(Constant):
+    COMMAND: str = 'Command'
     FOLDER: str = 'Folder'
     FOLDERS: str = 'Folders'
     IMPORT: str = 'Import'
@@ -66,7 +68,9 @@ class XmlTagName(Constant):
     PRE_ANONYMIZE_EVENT: str = 'PreAnonymizeEvent'
     PRE_PACKAGE_EVENT: str = 'PrePackageEvent'
     PRE_ZIP_EVENT: str = 'PreZipEvent'
+    SCRIPT: str = 'Script'
     SCRIPTS: str = 'Scripts'
+    VARIABLE: str = 'Variable'
     VARIABLES: str = 'Variables'
     ZIP_FILE: str = 'ZipFile'
     ZIP_FILES: str = 'ZipFiles'
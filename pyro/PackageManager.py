@@ -1,9 +1,12 @@
 import logging
 import os
 import shutil
+import stat
 import sys
 import typing
 import zipfile
+from concurrent.futures import (ThreadPoolExecutor,
+                                as_completed)
 
 from lxml import etree
 from wcmatch import (glob,
@@ -20,6 +23,7 @@ from pyro.CaseInsensitiveList import CaseInsensitiveList
 from pyro.Constants import (GameType,
                             XmlAttributeName)
 from pyro.PapyrusProject import PapyrusProject
+from pyro.PathHelper import PathHelper
 from pyro.ProcessManager import ProcessManager
 from pyro.ProjectOptions import ProjectOptions
 
@@ -31,6 +35,7 @@ class PackageManager:
     options: ProjectOptions
     pak_extension: str = ''
     zip_extension: str = ''
+    bsarch_prefix: str = ''
 
     DEFAULT_GLFLAGS = glob.NODIR | glob.MATCHBASE | glob.SPLIT | glob.REALPATH | glob.FOLLOW | glob.IGNORECASE | glob.MINUSNEGATE
     DEFAULT_WCFLAGS = wcmatch.SYMLINKS | wcmatch.IGNORECASE | wcmatch.MINUSNEGATE
@@ -46,24 +51,61 @@ class PackageManager:
         self.pak_extension = '.ba2' if self.options.game_type == GameType.FO4 else '.bsa'
         self.zip_extension = '.zip'
 
+        # constant prefix of every bsarch invocation; the remaining arguments depend on package contents
+        arguments = CommandArguments()
+        arguments.append(self.options.bsarch_path, enquote_value=True)
+        arguments.append('pack')
+        self.bsarch_prefix = arguments.join()
+
     @staticmethod
-    def _can_compress_package(containing_folder: str) -> bool:
-        flags = wcmatch.RECURSIVE | wcmatch.IGNORECASE
+    def _collect_file_suffixes(containing_folder: str) -> set:
+        """Returns casefolded extensions of files in folder from a single scandir walk"""
+        suffixes: set = set()
+        folders: list = [containing_folder]
 
-        # voices bad because bethesda no likey
-        for _ in wcmatch.WcMatch(containing_folder, '*.fuz', flags=flags).imatch():
-            return False
+        while folders:
+            try:
+                entries = os.scandir(folders.pop())
+            except OSError:
+                continue
 
-        # sounds bad because bethesda no likey
-        for _ in wcmatch.WcMatch(containing_folder, '*.wav|*.xwm', flags=flags).imatch():
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        folders.append(entry.path)
+                    elif entry.is_file():
+                        suffixes.add(os.path.splitext(entry.name)[1].casefold())
+
+        return suffixes
+
+    @staticmethod
+    def _can_compress_package(file_suffixes: set) -> bool:
+        # voices and sounds bad because bethesda no likey
+        if not file_suffixes.isdisjoint(('.fuz', '.wav', '.xwm')):
             return False
 
         # strings bad because wrye bash no likey
-        for _ in wcmatch.WcMatch(containing_folder, '*.*strings', flags=flags).imatch():
+        if any(endswith(suffix, 'strings') for suffix in file_suffixes):
             return False
 
         return True
 
+    @staticmethod
+    def _stat_mode(path: str) -> int:
+        """Returns st_mode for path, or 0 if inaccessible, so one stat answers isfile and isdir"""
+        try:
+            return os.stat(path).st_mode
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _link_or_copy(source_path: str, target_path: str) -> None:
+        try:
+            os.link(source_path, target_path)
+        except OSError:
+            # cross-device link or insufficient permissions
+            shutil.copyfile(source_path, target_path)
+
     @staticmethod
     def _check_write_permission(file_path: str) -> None:
         if os.path.isfile(file_path):
@@ -87,11 +129,16 @@ class PackageManager:
 
     @staticmethod
     def _generate_include_paths(includes_node: etree.ElementBase, root_path: str, zip_mode: bool = False) -> typing.Generator:
+        default_glflags: int = PackageManager.DEFAULT_GLFLAGS
+
         for include_node in filter(is_include_node, includes_node):
             attr_no_recurse: bool = include_node.get(XmlAttributeName.NO_RECURSE) == 'True'
             attr_path: str = include_node.get(XmlAttributeName.PATH).strip()
             search_path: str = include_node.text
 
+            # MATCHBASE would match slash-less patterns at any depth, defeating NoRecurse
+            glob_flags = default_glflags | glob.GLOBSTAR if not attr_no_recurse else default_glflags & ~glob.MATCHBASE
+
             if not search_path:
                 PackageManager.log.error(f'Include path at line {include_node.sourceline} in project file is empty')
                 sys.exit(1)
@@ -114,26 +161,27 @@ class PackageManager:
             if '*' in search_path:
                 for include_path in glob.iglob(search_path,
                                                root_dir=root_path,
-                                               flags=PackageManager.DEFAULT_GLFLAGS | glob.GLOBSTAR if not attr_no_recurse else 0x0):
+                                               flags=glob_flags):
                     yield os.path.join(root_path, include_path), attr_path
 
             elif not os.path.isabs(search_path):
                 test_path = os.path.normpath(os.path.join(root_path, search_path))
-                if os.path.isfile(test_path):
+                test_mode = PackageManager._stat_mode(test_path)
+                if stat.S_ISREG(test_mode):
                     yield test_path, attr_path
-                elif os.path.isdir(test_path):
+                elif stat.S_ISDIR(test_mode):
                     yield from PackageManager._match(test_path, '*.*',
                                                      user_path=attr_path,
                                                      no_recurse=attr_no_recurse)
                 else:
                     for include_path in glob.iglob(search_path,
                                                    root_dir=root_path,
-                                                   flags=PackageManager.DEFAULT_GLFLAGS | glob.GLOBSTAR if not attr_no_recurse else 0x0):
+                                                   flags=glob_flags):
                         yield os.path.join(root_path, include_path), attr_path
 
             # populate files list using absolute paths
             else:
-                if not zip_mode and root_path not in search_path:
+                if not zip_mode and not PathHelper.is_subpath(search_path, root_path):
                     PackageManager.log.error(f'Cannot include path outside RootDir: "{search_path}"')
                     sys.exit(1)
 
@@ -161,7 +209,7 @@ class PackageManager:
 
             if not os.path.isabs(in_path):
                 in_path = os.path.join(root_path, in_path)
-            elif zip_mode and root_path not in in_path:
+            elif zip_mode and not PathHelper.is_subpath(in_path, root_path):
                 PackageManager.log.error(f'Cannot match path outside RootDir: "{in_path}"')
                 sys.exit(1)
 
@@ -204,29 +252,27 @@ class PackageManager:
         """
         arguments = CommandArguments()
 
-        arguments.append(self.options.bsarch_path, enquote_value=True)
-        arguments.append('pack')
+        arguments.append(self.bsarch_prefix)
         arguments.append(containing_folder, enquote_value=True)
         arguments.append(output_path, enquote_value=True)
 
-        compressed_package = PackageManager._can_compress_package(containing_folder)
+        file_suffixes = PackageManager._collect_file_suffixes(containing_folder)
 
-        flags = wcmatch.RECURSIVE | wcmatch.IGNORECASE
+        compressed_package = PackageManager._can_compress_package(file_suffixes)
 
-        if self.options.game_type == GameType.FO4 or self.options.game_type == GameType.SF1:
-            for _ in wcmatch.WcMatch(containing_folder, '!*.dds', flags=flags).imatch():
+        game_type: str = self.options.game_type
+
+        if game_type == GameType.FO4 or game_type == GameType.SF1:
+            if any(suffix != '.dds' for suffix in file_suffixes):
                 arguments.append('-fo4')
-                break
             else:
                 arguments.append('-fo4dds')
-        elif self.options.game_type == GameType.SSE:
+        elif game_type == GameType.SSE:
             arguments.append('-sse')
 
-            if not compressed_package:
-                # SSE crashes when uncompressed BSA has Embed Filenames flag and contains textures
-                for _ in wcmatch.WcMatch(containing_folder, '*.dds', flags=flags).imatch():
-                    arguments.append('-af:0x3')
-                    break
+            # SSE crashes when uncompressed BSA has Embed Filenames flag and contains textures
+            if not compressed_package and '.dds' in file_suffixes:
+                arguments.append('-af:0x3')
         else:
             arguments.append('-tes5')
 
@@ -239,17 +285,60 @@ class PackageManager:
         return arguments.join()
 
     def create_packages(self) -> None:
+        temp_path: str = self.options.temp_path
+        package_path: str = self.options.package_path
+        project_path: str = self.ppj.project_path
+        no_hardlinks: bool = self.options.no_hardlinks
+        worker_limit: int = self.options.worker_limit
+
         # clear temporary data
-        if os.path.isdir(self.options.temp_path):
-            shutil.rmtree(self.options.temp_path, ignore_errors=True)
+        if os.path.isdir(temp_path):
+            shutil.rmtree(temp_path, ignore_errors=True)
 
         # ensure package path exists
-        if not os.path.isdir(self.options.package_path):
-            os.makedirs(self.options.package_path, exist_ok=True)
+        if not os.path.isdir(package_path):
+            os.makedirs(package_path, exist_ok=True)
 
         file_names = CaseInsensitiveList()
 
-        for i, package_node in enumerate(filter(is_package_node, self.ppj.packages_node)):
+        # overlap staging teardown with the next package instead of paying for it serially
+        cleanup_executor = ThreadPoolExecutor(max_workers=1)
+
+        # bsarch does not care about file metadata, so hardlinks (or plain copies) are enough
+        copy_func = shutil.copyfile if no_hardlinks else PackageManager._link_or_copy
+
+        def stage_files(created_folders: set, staging_pairs: dict, parallel_files: bool) -> None:
+            for target_folder in created_folders:
+                os.makedirs(target_folder, exist_ok=True)
+
+            if not parallel_files or len(staging_pairs) < 2:
+                for target_path, source_path in staging_pairs.items():
+                    copy_func(source_path, target_path)
+            else:
+                with ThreadPoolExecutor(max_workers=min(len(staging_pairs), worker_limit)) as executor:
+                    for _ in executor.map(copy_func, staging_pairs.values(), staging_pairs.keys()):
+                        pass
+
+        def stage_and_pack(created_folders: set, staging_pairs: dict, staging_path: str, file_path: str) -> None:
+            # concurrency comes from sibling packages here, so stage serially within the worker
+            stage_files(created_folders, staging_pairs, False)
+
+            ProcessManager.run_bsarch(self.build_commands(staging_path, file_path),
+                                      archive_name=os.path.basename(file_path))
+
+            # remove the staging folder before the worker picks up another package,
+            # so at most worker_limit staged trees exist at once
+            shutil.rmtree(staging_path, ignore_errors=True)
+
+        package_nodes: list = list(filter(is_package_node, self.ppj.packages_node))
+
+        # bsarch is mostly single-threaded, so distinct packages can build on distinct cores
+        parallel_packages: bool = not self.options.no_parallel and len(package_nodes) > 1
+
+        build_futures: list = []
+        build_executor = ThreadPoolExecutor(max_workers=min(len(package_nodes), worker_limit)) if parallel_packages else None
+
+        for i, package_node in enumerate(package_nodes):
             attr_file_name: str = package_node.get(XmlAttributeName.NAME)
 
             # noinspection PyProtectedMember
@@ -266,46 +355,74 @@ class PackageManager:
 
             attr_file_name = self._fix_package_extension(attr_file_name)
 
-            file_path: str = os.path.join(self.options.package_path, attr_file_name)
+            file_path: str = os.path.join(package_path, attr_file_name)
 
             self._check_write_permission(file_path)
 
             PackageManager.log.info(f'Creating "{attr_file_name}"...')
 
+            # each package stages into its own subfolder, so cleanup can run in the background
+            staging_path: str = os.path.join(temp_path, f'pkg_{i}')
+
+            # staging folder is unique per package, so track folders created for this one
+            created_folders: set = set()
+
+            # map target to source so duplicate includes are staged only once (last include wins)
+            staging_pairs: dict = {}
+
             for source_path, attr_path in self._generate_include_paths(package_node, root_dir):
                 if os.path.isabs(source_path):
                     relpath: str = os.path.relpath(source_path, root_dir)
                 else:
                     relpath: str = source_path  # type: ignore
-                    source_path = os.path.join(self.ppj.project_path, source_path)
+                    source_path = os.path.join(project_path, source_path)
+
+                relpath_cf: str = relpath.casefold()
 
                 adj_relpath = os.path.normpath(os.path.join(attr_path, relpath))
 
                 PackageManager.log.debug(f'+ "{adj_relpath.casefold()}"')
 
-                target_path: str = os.path.join(self.options.temp_path, adj_relpath)
+                target_path: str = os.path.join(staging_path, adj_relpath)
 
                 # fix target path if user passes a deeper package root (RootDir)
-                if endswith(source_path, '.pex', ignorecase=True) and not startswith(relpath, 'scripts', ignorecase=True):
-                    target_path = os.path.join(self.options.temp_path, 'Scripts', relpath)
+                if relpath_cf.endswith('.pex') and not relpath_cf.startswith('scripts'):
+                    target_path = os.path.join(staging_path, 'Scripts', relpath)
+
+                created_folders.add(os.path.dirname(target_path))
 
-                os.makedirs(os.path.dirname(target_path), exist_ok=True)
-                shutil.copy2(source_path, target_path)
+                staging_pairs[target_path] = source_path
 
                 self.includes += 1
 
-            # run bsarch
-            command: str = self.build_commands(self.options.temp_path, file_path)
-            ProcessManager.run_bsarch(command)
+            if build_executor is not None:
+                # each unit of work stages, packs, and removes one package
+                build_futures.append(build_executor.submit(stage_and_pack, created_folders, staging_pairs, staging_path, file_path))
+            else:
+                # one package at a time, so fan the copies out instead and pack before staging the next
+                stage_files(created_folders, staging_pairs, not self.options.no_parallel)
+
+                ProcessManager.run_bsarch(self.build_commands(staging_path, file_path))
+
+                cleanup_executor.submit(shutil.rmtree, staging_path, ignore_errors=True)
+
+        if build_executor is not None:
+            for future in as_completed(build_futures):
+                future.result()
+            build_executor.shutdown(wait=True)
 
-            # clear temporary data
-            if os.path.isdir(self.options.temp_path):
-                shutil.rmtree(self.options.temp_path, ignore_errors=True)
+        # wait for outstanding cleanups, then remove the now-empty temp folder
+        cleanup_executor.shutdown(wait=True)
+
+        if os.path.isdir(temp_path):
+            shutil.rmtree(temp_path, ignore_errors=True)
 
     def create_zip(self) -> None:
+        zip_output_path: str = self.options.zip_output_path
+
         # ensure zip output path exists
-        if not os.path.isdir(self.options.zip_output_path):
-            os.makedirs(self.options.zip_output_path, exist_ok=True)
+        if not os.path.isdir(zip_output_path):
+            os.makedirs(zip_output_path, exist_ok=True)
 
         file_names = CaseInsensitiveList()
 
@@ -321,7 +438,7 @@ class PackageManager:
 
             attr_file_name = self._fix_zip_extension(attr_file_name)
 
-            file_path: str = os.path.join(self.options.zip_output_path, attr_file_name)
+            file_path: str = os.path.join(zip_output_path, attr_file_name)
 
             self._check_write_permission(file_path)
 
@@ -333,6 +450,16 @@ class PackageManager:
                 PackageManager.log.error(f'"{compress_str}" is not a valid compression type, defaulting to STORE')
                 compress_type = 0
 
+            compress_level_str: str = zip_node.get(XmlAttributeName.COMPRESSION_LEVEL)
+
+            try:
+                compress_level = int(compress_level_str)
+                if not 0 <= compress_level <= 9:
+                    raise ValueError
+            except (TypeError, ValueError):
+                PackageManager.log.error(f'"{compress_level_str}" is not a valid compression level, defaulting to 1')
+                compress_level = 1
+
             root_dir: str = self.ppj._get_path(zip_node.get(XmlAttributeName.ROOT_DIR),
                                                relative_root_path=self.ppj.project_path,
                                                fallback_path='')
@@ -341,10 +468,10 @@ class PackageManager:
                 PackageManager.log.info(f'Creating "{attr_file_name}"...')
 
                 try:
-                    with zipfile.ZipFile(file_path, mode='w', compression=compress_type) as z:
+                    with zipfile.ZipFile(file_path, mode='w', compression=compress_type, compresslevel=compress_level) as z:
                         for include_path, attr_path in self._generate_include_paths(zip_node, root_dir, True):
                             if not attr_path:
-                                if root_dir in include_path:
+                                if PathHelper.is_subpath(include_path, root_dir):
                                     arcname = os.path.relpath(include_path, root_dir)
                                 else:
                                     # just add file to zip root
@@ -72,7 +72,8 @@ class PapyrusProject(ProjectBase):
     def __init__(self, options: ProjectOptions) -> None:
         super(PapyrusProject, self).__init__(options)
 
-        xml_parser: etree.XMLParser = etree.XMLParser(remove_blank_text=True, remove_comments=True)
+        # collect_ids is wasted work here: PPJ elements are never looked up by XML ID
+        xml_parser: etree.XMLParser = etree.XMLParser(remove_blank_text=True, remove_comments=True, collect_ids=False)
 
         if self.options.create_project:
             sys.exit(1)
@@ -379,6 +380,8 @@ class PapyrusProject(ProjectBase):
                     node.set(XmlAttributeName.COMPRESSION, 'deflate')
                 else:
                     node.set(XmlAttributeName.COMPRESSION, node.get(XmlAttributeName.COMPRESSION).casefold())
+                if XmlAttributeName.COMPRESSION_LEVEL not in node.attrib:
+                    node.set(XmlAttributeName.COMPRESSION_LEVEL, '1')
 
             elif tag in (XmlTagName.PRE_BUILD_EVENT, XmlTagName.POST_BUILD_EVENT,
                          XmlTagName.PRE_IMPORT_EVENT, XmlTagName.POST_IMPORT_EVENT):
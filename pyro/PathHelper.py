@@ -50,6 +50,13 @@ class PathHelper:
 
         return file_name
 
+    @staticmethod
+    def is_subpath(path: str, root_path: str) -> bool:
+        """Returns whether path is equal to or contained within root_path"""
+        path = os.path.normcase(os.path.abspath(path))
+        root_path = os.path.normcase(os.path.abspath(root_path))
+        return path == root_path or startswith(path, root_path + os.sep)
+
     @staticmethod
     def find_script_paths_from_folder(root_dir: str, *, no_recurse: bool, matcher: Optional[wcmatch.WcMatch] = None) -> Generator:
         """Yields existing script paths starting from absolute folder path"""
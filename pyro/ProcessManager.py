@@ -76,13 +76,16 @@ class ProcessManager:
         return ProcessState.SUCCESS
 
     @staticmethod
-    def run_bsarch(command: str) -> ProcessState:
+    def run_bsarch(command: str, archive_name: str = '') -> ProcessState:
         """
         Creates bsarch process and logs output to console
 
         :param command: Command to execute, including absolute path to executable and its arguments
+        :param archive_name: When set, prefixes logged output so concurrent invocations stay attributable
         :return: ProcessState (SUCCESS, FAILURE, INTERRUPTED, ERRORS)
         """
+        prefix: str = f'[{archive_name}] ' if archive_name else ''
+
         try:
             process = subprocess.Popen(command,
                                        stdout=subprocess.PIPE,
@@ -119,15 +122,15 @@ class ProcessManager:
 
                     if startswith(line, 'Packing'):
                         package_path = line.split(':', 1)[1].strip()
-                        ProcessManager.log.info(f'Packaging folder "{package_path}"...')
+                        ProcessManager.log.info(f'{prefix}Packaging folder "{package_path}"...')
                         continue
 
                     if startswith(line, 'Archive Name'):
                         archive_path = line.split(':', 1)[1].strip()
-                        ProcessManager.log.info(f'Building "{archive_path}"...')
+                        ProcessManager.log.info(f'{prefix}Building "{archive_path}"...')
                         continue
 
-                    ProcessManager.log.info(line)
+                    ProcessManager.log.info(f'{prefix}{line}')
 
         except KeyboardInterrupt:
             try:
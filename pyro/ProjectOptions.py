@@ -35,6 +35,7 @@ class ProjectOptions:
 
     # bsarch arguments
     bsarch_path: str = field(init=False, default_factory=str)
+    no_hardlinks: bool = field(init=False, default_factory=bool)
     package_path: str = field(init=False, default_factory=str)
     temp_path: str = field(init=False, default_factory=str)
 
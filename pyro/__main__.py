@@ -85,6 +85,10 @@ if __name__ == '__main__':
                                    action='store', type=str,
                                    help='relative or absolute path to bsarch.exe\n'
                                         '(if relative, must be relative to current working directory)')
+    _bsarch_arguments.add_argument('--no-hardlinks',
+                                   action='store_true', default=False,
+                                   help='do not stage package files with hardlinks\n'
+                                        '(default: hardlink when temp folder is on the same volume)')
     _bsarch_arguments.add_argument('--package-path',
                                    action='store', type=str,
                                    help='relative or absolute path to bsa/ba2 output folder\n'